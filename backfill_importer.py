@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Historical Gold Price Backfill Importer
+=======================================
+
+This script streams large historical datasets into the gold prices database.
+It reads CSV files in the format written by export_data_to_csv as well as
+gzipped vendor archives (.csv.gz), validates and normalizes every row and
+bulk-loads them in large transactions. Indexes are dropped during the load
+and rebuilt at the end, and progress is checkpointed so an
+interrupted import resumes where it stopped.
+
+Stop scheduled scraping while a backfill runs, live upserts need the index.
+
+Known limitation: throughput is bound by per-row Python parsing and SQLite
+inserts. Measured on a small VM, 10M rows took about 98s (76s load, 21s
+index rebuild), where the insert and rebuild alone account for about 50s.
+This does not reach the 'well under a minute' target for 10M rows.
+
+Usage: python3 backfill_importer.py [--db gold_prices.db] FILE [FILE ...]
+"""
+
+from price_scraper import GoldPriceScraper, NATURAL_KEY_INDEX, DATE_TIME_INDEX
+from datetime import datetime, timedelta
+from itertools import islice
+import argparse
+import csv
+import gzip
+import logging
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Accepted header names for each column, matched case-insensitively
+COLUMN_ALIASES = {
+    'date_time': ('date_time', 'datetime', 'timestamp', 'date', 'time'),
+    'price': ('price_per_gram', 'price', 'close', 'value'),
+    'currency': ('currency', 'ccy'),
+    'source': ('source',),
+    'instrument': ('instrument', 'symbol'),
+}
+
+CURRENCY_ALIASES = {'': 'TRY', 'TRY': 'TRY', 'TL': 'TRY', '₺': 'TRY', 'YTL': 'TRY'}
+
+# Fallback timestamp formats used by Turkish vendors, tried after ISO 8601
+TIMESTAMP_FORMATS = ('%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%d.%m.%Y',
+                     '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+# Timestamps outside [EARLIEST_TIMESTAMP, now + FUTURE_TOLERANCE] are rejected,
+# which also catches bare years and spreadsheet serial dates read as epochs
+EARLIEST_TIMESTAMP = datetime(2000, 1, 1)
+FUTURE_TOLERANCE = timedelta(days=1)
+
+PLAIN_NUMBER = re.compile(r'\d+(\.\d+)?')
+# One separator followed by three digits: '4.281' or '1,234' may be thousands or decimals
+AMBIGUOUS_NUMBER = re.compile(r'\d{1,3}[.,]\d{3}')
+
+THOUSANDS_GROUPING = {
+    '.': re.compile(r'\d{1,3}(\.\d{3})+'),
+    ',': re.compile(r'\d{1,3}(,\d{3})+'),
+}
+
+INSERT_SQL = '''
+    INSERT INTO gold_prices (date_time, price_per_gram, currency, source, instrument, time_bucket)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def parse_timestamp(value, latest=None):
+    """Parse a timestamp into a naive local datetime, like datetime.now() stores
+
+    Returns the datetime and its database text form, reusing the input text
+    when it is already in the 'YYYY-MM-DD HH:MM:SS[.ffffff]' form. Timestamps
+    before 2000 or after latest (default: now plus one day) are rejected.
+    """
+    if latest is None:
+        latest = datetime.now() + FUTURE_TOLERANCE
+    text = None
+    try:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None and len(value) >= 19 and value[10] == ' ':
+            text = value
+    except ValueError:
+        value = value.strip()
+        parsed = None
+        for fmt in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            # Epoch seconds as a last resort
+            parsed = datetime.fromtimestamp(float(value))
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    if not EARLIEST_TIMESTAMP <= parsed <= latest:
+        raise ValueError(f"timestamp {value!r} out of range")
+    return parsed, text or parsed.isoformat(' ')
+
+
+def parse_price(value):
+    """Parse a price written with '.' or ',' as decimal or thousands separator
+
+    A single separator followed by exactly three digits ('4.281', '1,234') is
+    ambiguous and rejected. Plain numbers ('4281.99', as export_data_to_csv
+    writes them) parse directly. Otherwise the separator that comes last is
+    the decimal one, and the other must group digits in threes ('4.281,99',
+    '4,281.99').
+    """
+    value = value.replace('₺', '').strip()
+    if AMBIGUOUS_NUMBER.fullmatch(value):
+        raise ValueError(f"ambiguous price {value!r}, the separator may group thousands")
+    if PLAIN_NUMBER.fullmatch(value):
+        price = float(value)
+    else:
+        price = float(_normalize_separators(value))
+    if not math.isfinite(price) or price <= 0:
+        raise ValueError(f"invalid price {price}")
+    return price
+
+
+def _normalize_separators(value):
+    """Rewrite a formatted number with '.' as the only, decimal, separator"""
+    last = max(value.rfind('.'), value.rfind(','))
+    if last < 0:
+        # Plain digits were handled by the caller, this catches '1e3', '1_000', 'nan'...
+        raise ValueError(f"invalid price {value!r}")
+
+    separator = value[last]
+    other = ',' if separator == '.' else '.'
+    if value.count(separator) > 1:
+        # '1.234.567' or '1,234,567': the separator only groups thousands
+        integer, fraction, thousands = value, '', separator
+    else:
+        integer, fraction, thousands = value[:last], value[last + 1:], other
+        if other not in integer and len(fraction) == 3:
+            raise ValueError(f"ambiguous price {value!r}, '{separator}' may be a thousands separator")
+
+    if thousands in integer:
+        if not THOUSANDS_GROUPING[thousands].fullmatch(integer):
+            raise ValueError(f"invalid digit grouping in price {value!r}")
+        integer = integer.replace(thousands, '')
+    if not integer.isdigit() or (fraction and not fraction.isdigit()):
+        raise ValueError(f"invalid price {value!r}")
+    return f"{integer}.{fraction}" if fraction else integer
+
+
+def normalize_currency(value):
+    """Map currency spellings onto TRY, rejecting anything else"""
+    currency = CURRENCY_ALIASES.get(value.strip().upper())
+    if currency is None:
+        raise ValueError(f"unsupported currency {value!r}")
+    return currency
+
+
+class BackfillImporter:
+    def __init__(self, db_path='gold_prices.db', source='IMPORT', chunk_size=50000,
+                 transaction_rows=1000000):
+        self.db_path = db_path
+        self.default_source = source
+        self.chunk_size = chunk_size
+        # Rows per transaction, progress is checkpointed at every commit
+        self.transaction_rows = transaction_rows
+        self.scraper = GoldPriceScraper(db_path=db_path)
+        self.init_progress_table()
+
+    def init_progress_table(self):
+        """Create the table tracking how far each file has been imported"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS import_progress (
+                file_key TEXT PRIMARY KEY,
+                rows_done INTEGER DEFAULT 0,
+                rows_imported INTEGER DEFAULT 0,
+                completed INTEGER DEFAULT 0,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _file_key(self, path):
+        """Identify a file by path, size and modification time"""
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+
+    def _open(self, path):
+        with open(path, 'rb') as f:
+            is_gzip = f.read(2) == b'\x1f\x8b'
+        if is_gzip:
+            return gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+        return open(path, 'r', encoding='utf-8-sig', newline='')
+
+    def _column_indexes(self, header):
+        """Map logical columns onto positions in the CSV header"""
+        names = [name.strip().lower() for name in header]
+        indexes = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in names:
+                    indexes[column] = names.index(alias)
+                    break
+
+        missing = [column for column in ('date_time', 'price') if column not in indexes]
+        if missing:
+            raise ValueError(f"CSV header is missing required columns: {', '.join(missing)}")
+        return indexes
+
+    def _normalize_rows(self, rows, indexes, stats):
+        """Validate and convert raw CSV rows into database rows"""
+        date_idx = indexes['date_time']
+        price_idx = indexes['price']
+        currency_idx = indexes.get('currency')
+        source_idx = indexes.get('source')
+        instrument_idx = indexes.get('instrument')
+        default_source = self.default_source
+        default_instrument = self.scraper.instrument
+        time_bucket = self.scraper.time_bucket
+        latest = datetime.now() + FUTURE_TOLERANCE
+
+        normalized = []
+        for row in rows:
+            try:
+                date_time, date_text = parse_timestamp(row[date_idx], latest)
+                price = parse_price(row[price_idx])
+                currency = normalize_currency(row[currency_idx]) if currency_idx is not None else 'TRY'
+                source = (row[source_idx].strip() if source_idx is not None else '') or default_source
+                instrument = (row[instrument_idx].strip() if instrument_idx is not None else '') or default_instrument
+            except (ValueError, IndexError, OverflowError) as e:
+                stats['invalid'] += 1
+                if stats['invalid'] <= 10:
+                    logger.warning(f"Skipping invalid row {row!r}: {e}")
+                continue
+
+            normalized.append((date_text, price, currency, source, instrument, time_bucket(date_time)))
+        return normalized
+
+    def import_file(self, path):
+        """Import a CSV or gzipped CSV file, resuming a previous partial import"""
+        file_key = self._file_key(path)
+        conn = sqlite3.connect(self.db_path)
+        progress = conn.execute(
+            "SELECT rows_done, rows_imported, completed FROM import_progress WHERE file_key = ?", (file_key,)
+        ).fetchone()
+        conn.close()
+
+        if progress and progress[2]:
+            logger.info(f"{path} was already imported, skipping")
+            return progress[1]
+
+        rows_done, rows_imported = progress[:2] if progress else (0, 0)
+        if rows_done:
+            logger.info(f"Resuming import of {path} after {rows_done} rows")
+
+        stats = {'invalid': 0}
+        started = time.time()
+
+        with self._open(path) as f:
+            reader = csv.reader(f)
+
+            # Validate the header before touching any index
+            header = next(reader, None)
+            if header is None:
+                raise ValueError(f"{path} is empty")
+            indexes = self._column_indexes(header)
+
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            cursor = conn.cursor()
+
+            # Bulk-load settings, only for this connection
+            cursor.execute("PRAGMA synchronous = NORMAL")
+            cursor.execute("PRAGMA temp_store = MEMORY")
+            cursor.execute("PRAGMA cache_size = -200000")
+
+            # Defer indexes until the load is done
+            for index in (NATURAL_KEY_INDEX, DATE_TIME_INDEX):
+                cursor.execute("DROP INDEX IF EXISTS {}".format(index))
+
+            try:
+                # Skip what an interrupted run already committed
+                if rows_done:
+                    for _ in islice(reader, rows_done):
+                        pass
+
+                cursor.execute("BEGIN")
+                rows_in_transaction = 0
+                while True:
+                    chunk = list(islice(reader, self.chunk_size))
+                    if not chunk:
+                        break
+
+                    rows = self._normalize_rows(chunk, indexes, stats)
+                    cursor.executemany(INSERT_SQL, rows)
+                    rows_done += len(chunk)
+                    rows_imported += len(rows)
+                    rows_in_transaction += len(chunk)
+
+                    if rows_in_transaction >= self.transaction_rows:
+                        self._save_progress(cursor, file_key, rows_done, rows_imported)
+                        cursor.execute("COMMIT")
+                        logger.info(f"Imported {rows_done} rows from {path}")
+                        cursor.execute("BEGIN")
+                        rows_in_transaction = 0
+
+                self._save_progress(cursor, file_key, rows_done, rows_imported)
+                cursor.execute("COMMIT")
+            finally:
+                # Closing rolls back an unfinished transaction. The indexes are rebuilt
+                # even when the load fails, running writers depend on the natural key.
+                # Rebuilding it deduplicates only if the imported rows overlap, later
+                # rows win over earlier ones for the same bucket.
+                conn.close()
+                loaded = time.time()
+                logger.info("Rebuilding indexes...")
+                self.scraper.init_database()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE import_progress SET completed = 1 WHERE file_key = ?", (file_key,))
+        conn.commit()
+        conn.close()
+
+        elapsed = time.time() - started
+        logger.info(f"Imported {rows_imported} rows from {path} in {elapsed:.1f}s "
+                    f"(load {loaded - started:.1f}s, index rebuild {time.time() - loaded:.1f}s, "
+                    f"{stats['invalid']} invalid rows skipped)")
+        return rows_imported
+
+    def _save_progress(self, cursor, file_key, rows_done, rows_imported):
+        cursor.execute('''
+            INSERT INTO import_progress (file_key, rows_done, rows_imported, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(file_key) DO UPDATE SET
+                rows_done = excluded.rows_done,
+                rows_imported = excluded.rows_imported,
+                updated_at = excluded.updated_at
+        ''', (file_key, rows_done, rows_imported))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill historical gold prices from CSV or .csv.gz files")
+    parser.add_argument('files', nargs='+', help="CSV or gzipped CSV files to import")
+    parser.add_argument('--db', default='gold_prices.db', help="Database path (default: gold_prices.db)")
+    parser.add_argument('--source', default='IMPORT', help="Source for rows without a source column")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows parsed per chunk")
+    args = parser.parse_args()
+
+    importer = BackfillImporter(db_path=args.db, source=args.source, chunk_size=args.chunk_size)
+
+    total = 0
+    failed = []
+    for path in args.files:
+        print(f"📥 Importing {path}...")
+        try:
+            total += importer.import_file(path)
+        except (ValueError, OSError, EOFError, csv.Error) as e:
+            print(f"❌ Could not import {path}: {e}")
+            failed.append(path)
+
+    print(f"✅ Imported {total} rows into {args.db}")
+    if failed:
+        print(f"❌ {len(failed)} file(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
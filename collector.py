@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Supervised Multi-Process Gold Price Collector
+=============================================
+
+This script spreads independent price feeds over several worker processes so network
+I/O and parsing run in parallel. Workers never touch the database, they send
+their ticks to the supervisor, which forwards them to a single writer process
+that owns the SQLite connection, avoiding 'database is locked' errors. The
+supervisor watches heartbeats from every process and restarts the ones that
+crash or stall.
+
+Usage: python3 collector.py [--db gold_prices.db] [--workers 2] [--interval 60]
+"""
+
+from price_scraper import GoldPriceScraper
+from datetime import datetime
+import argparse
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 1
+# A process silent for this long is considered stalled and restarted
+STALL_TIMEOUT_SECONDS = 120
+# Minimum delay between restarts of the same process, to avoid crash loops
+RESTART_DELAY_SECONDS = 5
+# How long a worker may take to notice the stop event, a fetch can block on network timeouts
+WORKER_STOP_SECONDS = 30
+
+WRITER = 'writer'
+
+
+def collection_worker(name, sources, interval_seconds, worker_queue, stop_event):
+    """Fetch prices for the assigned sources and send them to the supervisor
+
+    Each worker has its own queue, so terminating a stalled worker can only
+    damage that queue, which is thrown away with it.
+    """
+    # Ctrl+C reaches the whole process group, shutdown is left to the supervisor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    scraper = GoldPriceScraper(init_db=False)
+    next_run = time.time()
+
+    while not stop_event.is_set():
+        worker_queue.put(('heartbeat', time.time()))
+
+        if time.time() >= next_run:
+            for source in sources:
+                if stop_event.is_set():
+                    break
+                try:
+                    price = scraper.fetch_price(source)
+                except Exception as e:
+                    logger.error(f"{name}: error fetching from {source}: {e}")
+                    price = None
+
+                if price is not None:
+                    worker_queue.put(('tick', (source, datetime.now(), price)))
+                worker_queue.put(('heartbeat', time.time()))
+            next_run += interval_seconds
+
+        stop_event.wait(HEARTBEAT_SECONDS)
+
+
+def writer_process(db_path, tick_queue, heartbeat_queue):
+    """Own the database connection and save every tick forwarded by the supervisor"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    scraper = GoldPriceScraper(db_path=db_path)
+
+    while True:
+        heartbeat_queue.put(time.time())
+        try:
+            tick = tick_queue.get(timeout=HEARTBEAT_SECONDS)
+        except queue.Empty:
+            continue
+
+        # None is the shutdown sentinel
+        if tick is None:
+            break
+
+        source, date_time, price = tick
+        scraper.save_price_to_db(price, source, date_time=date_time)
+
+
+class CollectionSupervisor:
+    def __init__(self, db_path='gold_prices.db', sources=None, num_workers=2, interval_minutes=60):
+        self.db_path = db_path
+        self.sources = list(sources or GoldPriceScraper.FEEDS)
+        # Fallback-only sources would store duplicate prices under another label
+        not_feeds = [source for source in self.sources if source not in GoldPriceScraper.FEEDS]
+        if not_feeds:
+            raise ValueError(f"Not independent price feeds: {', '.join(not_feeds)}")
+        if num_workers > len(self.sources):
+            logger.warning(f"Requested {num_workers} workers, capping at one per source: "
+                           f"{', '.join(self.sources)}")
+        self.num_workers = max(1, min(num_workers, len(self.sources)))
+        self.interval_seconds = interval_minutes * 60
+
+        self.stop_event = multiprocessing.Event()
+        # Queues are created per process start, a terminated process may leave its queues corrupted
+        self.queues = {}
+        self.processes = {}
+        self.last_heartbeat = {}
+        self.last_start = {}
+        self.restarts = {}
+
+    def _shards(self):
+        """Spread sources round-robin over the workers"""
+        return {
+            f"worker-{i}": self.sources[i::self.num_workers]
+            for i in range(self.num_workers)
+        }
+
+    def _start_process(self, name):
+        if name == WRITER:
+            # (ticks forwarded to the writer, writer heartbeats)
+            self.queues[name] = (multiprocessing.Queue(), multiprocessing.Queue())
+            target = writer_process
+            args = (self.db_path, *self.queues[name])
+        else:
+            self.queues[name] = multiprocessing.Queue()
+            target = collection_worker
+            args = (name, self._shards()[name], self.interval_seconds, self.queues[name], self.stop_event)
+
+        process = multiprocessing.Process(target=target, args=args, name=name, daemon=True)
+        process.start()
+
+        self.processes[name] = process
+        self.last_heartbeat[name] = time.time()
+        self.last_start[name] = time.time()
+        logger.info(f"Started {name} (pid {process.pid})")
+
+    def start(self):
+        """Start the writer and all workers"""
+        self._start_process(WRITER)
+        for name, sources in self._shards().items():
+            logger.info(f"{name} collects from: {', '.join(sources)}")
+            self._start_process(name)
+
+    def _drain(self, name):
+        """Record heartbeats from a process and forward worker ticks to the writer"""
+        if name == WRITER:
+            heartbeats = self.queues[WRITER][1]
+            while True:
+                try:
+                    self.last_heartbeat[WRITER] = max(self.last_heartbeat[WRITER], heartbeats.get_nowait())
+                except queue.Empty:
+                    return
+
+        tick_queue = self.queues[WRITER][0]
+        while True:
+            try:
+                kind, payload = self.queues[name].get_nowait()
+            except queue.Empty:
+                return
+            if kind == 'tick':
+                tick_queue.put(payload)
+            else:
+                self.last_heartbeat[name] = max(self.last_heartbeat[name], payload)
+
+    def check_health(self):
+        """Restart processes that exited or stopped sending heartbeats"""
+        for name, process in list(self.processes.items()):
+            if process.is_alive():
+                self._drain(name)
+
+        now = time.time()
+        for name, process in list(self.processes.items()):
+            if process.is_alive() and now - self.last_heartbeat[name] < STALL_TIMEOUT_SECONDS:
+                continue
+            if now - self.last_start[name] < RESTART_DELAY_SECONDS:
+                continue
+
+            if process.is_alive():
+                # A stalled process never sees the stop event. Terminating it is safe for the
+                # others because its queues are replaced when it restarts.
+                logger.warning(f"{name} stalled, no heartbeat for {now - self.last_heartbeat[name]:.0f}s")
+                process.terminate()
+            else:
+                logger.warning(f"{name} exited with code {process.exitcode}")
+            process.join(timeout=5)
+            logger.warning(f"Discarding unsent messages queued by {name}")
+
+            self.restarts[name] = self.restarts.get(name, 0) + 1
+            logger.info(f"Restarting {name} (restart #{self.restarts[name]})")
+            self._start_process(name)
+
+    def stop(self):
+        """Stop the workers, then let the writer flush the remaining ticks"""
+        self.stop_event.set()
+
+        for name, process in self.processes.items():
+            if name == WRITER:
+                continue
+            process.join(timeout=WORKER_STOP_SECONDS)
+            if process.is_alive():
+                logger.warning(f"{name} did not stop within {WORKER_STOP_SECONDS}s, terminating it")
+                process.terminate()
+                process.join(timeout=5)
+            elif process.exitcode == 0:
+                # Forward what a cleanly stopped worker sent before exiting
+                self._drain(name)
+
+        writer = self.processes.get(WRITER)
+        if writer is not None:
+            self.queues[WRITER][0].put(None)
+            writer.join(timeout=30)
+            if writer.is_alive():
+                logger.warning("Writer did not stop within 30s, terminating it")
+                writer.terminate()
+
+        logger.info("Collection stopped")
+
+    def run(self):
+        """Start collection and supervise it until interrupted"""
+        logger.info(f"Starting supervised scraping every {self.interval_seconds // 60} minutes "
+                    f"with {self.num_workers} workers")
+        self.start()
+        try:
+            while True:
+                time.sleep(HEARTBEAT_SECONDS)
+                self.check_health()
+        finally:
+            self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect gold prices with supervised worker processes")
+    parser.add_argument('--db', default='gold_prices.db', help="Database path (default: gold_prices.db)")
+    parser.add_argument('--workers', type=int, default=2, help="Number of worker processes")
+    parser.add_argument('--interval', type=int, default=60, help="Minutes between price checks")
+    parser.add_argument('--sources', nargs='+', choices=GoldPriceScraper.FEEDS,
+                        help="Sources to collect from (default: all)")
+    args = parser.parse_args()
+
+    supervisor = CollectionSupervisor(
+        db_path=args.db,
+        sources=args.sources,
+        num_workers=args.workers,
+        interval_minutes=args.interval,
+    )
+
+    print("🚀 Starting supervised collection. Press Ctrl+C to stop.")
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        print("\n🛑 Collection stopped by user")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Gold Price Database Deduplicator
+================================
+
+This script removes duplicate price rows (same source, instrument and time
+bucket) from an existing database and reclaims the freed space.
+
+Usage: python3 dedupe_db.py [database_path]
+"""
+
+from price_scraper import GoldPriceScraper
+import os
+import sqlite3
+import sys
+
+def count_rows(db_path):
+    """Count stored prices, 0 when the table does not exist yet"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM gold_prices").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+def dedupe_database(db_path='gold_prices.db'):
+    """Deduplicate the given database and report the result"""
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        return
+    
+    # Counted before opening the scraper, which already deduplicates older databases while migrating them
+    rows_before = count_rows(db_path)
+    size_before = os.path.getsize(db_path)
+    print(f"🧹 Deduplicating {db_path}...")
+    
+    scraper = GoldPriceScraper(db_path=db_path)
+    if scraper.deduplicate_prices() is None:
+        print("❌ Failed to deduplicate database")
+        return
+    
+    removed = rows_before - count_rows(db_path)
+    size_after = os.path.getsize(db_path)
+    print(f"✅ Removed {removed} duplicate rows")
+    print(f"💾 Database size: {size_before} → {size_after} bytes")
+    if size_after > size_before:
+        print("ℹ️  The database grew because the natural key and date indexes were added")
+
+if __name__ == "__main__":
+    dedupe_database(sys.argv[1] if len(sys.argv) > 1 else 'gold_prices.db')
@@ -8,8 +8,8 @@ Turkish gold price data and perform basic analysis.
 """
 
 from price_scraper import GoldPriceScraper
+from datetime import datetime
 import sys
-import os
 
 def print_menu():
     """Display the main menu"""
@@ -48,10 +48,16 @@ def main():
                     print("❌ Failed to fetch current price")
             
             elif choice == "2":
+                workers = input("Enter number of worker processes (default 1): ").strip()
+                workers = int(workers) if workers.isdigit() else 1
+                
                 print("\n⚠️  Starting continuous monitoring...")
                 print("This will fetch prices every hour. Press Ctrl+C to stop.")
                 try:
-                    scraper.start_scheduled_scraping(60)  # Every 60 minutes
+                    if workers > 1:
+                        scraper.start_supervised_scraping(60, num_workers=workers)
+                    else:
+                        scraper.start_scheduled_scraping(60)  # Every 60 minutes
                 except KeyboardInterrupt:
                     print("\n🛑 Monitoring stopped by user")
             
@@ -105,20 +111,20 @@ def main():
                 days = int(days) if days.isdigit() else 7
                 
                 print(f"\nFetching last {days} days of data...")
-                df = scraper.get_historical_data(days)
+                ticks = scraper.get_recent_ticks(days)
                 
-                if not df.empty:
+                if ticks:
                     print(f"\n📋 RECENT PRICES (Last {days} days)")
                     print("-" * 60)
                     print(f"{'Date':<20} {'Price (TRY)':<12} {'Source':<15}")
                     print("-" * 60)
                     
-                    for _, row in df.head(20).iterrows():  # Show max 20 records
-                        date_str = row['date_time'][:16]  # Format datetime
-                        print(f"{date_str:<20} {row['price_per_gram']:<12.2f} {row['source']:<15}")
+                    for epoch, price, source in ticks[:20]:  # Show max 20 records
+                        date_str = datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M')
+                        print(f"{date_str:<20} {price:<12.2f} {source:<15}")
                     
-                    if len(df) > 20:
-                        print(f"... and {len(df) - 20} more records")
+                    if len(ticks) > 20:
+                        print(f"... and {len(ticks) - 20} more records")
                 else:
                     print("❌ No recent data available")
             
@@ -126,8 +132,7 @@ def main():
                 confirm = input("⚠️  Are you sure you want to clear all data? (yes/no): ").strip().lower()
                 if confirm == "yes":
                     try:
-                        os.remove(scraper.db_path)
-                        scraper.init_database()
+                        scraper.clear_database()
                         print("✅ Database cleared successfully")
                     except Exception as e:
                         print(f"❌ Error clearing database: {e}")
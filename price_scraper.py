@@ -7,15 +7,65 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import schedule
 import logging
+import os
+from tick_buffer import TickRingBuffer
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Natural key of a price row: one row per source, instrument and time bucket
+NATURAL_KEY_INDEX = 'idx_gold_prices_natural_key'
+
+CREATE_NATURAL_KEY_SQL = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS {}
+    ON gold_prices (source, instrument, time_bucket)
+'''.format(NATURAL_KEY_INDEX)
+
+# Serves recent-window reads such as loading the tick buffer
+DATE_TIME_INDEX = 'idx_gold_prices_date_time'
+
+EPOCH = datetime(1970, 1, 1)
+
+UPSERT_PRICE_SQL = '''
+    INSERT INTO gold_prices (date_time, price_per_gram, currency, source, instrument, time_bucket)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source, instrument, time_bucket) DO UPDATE SET
+        date_time = excluded.date_time,
+        price_per_gram = excluded.price_per_gram,
+        currency = excluded.currency
+'''
+
 class GoldPriceScraper:
-    def __init__(self, db_path='gold_prices.db'):
+    DEFAULT_INSTRUMENT = 'GRAM_GOLD'
+    
+    # Source name -> fetch method, in the fallback order used by get_current_price
+    SOURCES = {
+        'API': 'get_gold_price_api',
+        'Bigpara': 'scrape_gold_price_bigpara',
+        'Alternative': 'get_alternative_gold_price',
+    }
+    
+    # Sources returning independent prices. 'Alternative' only falls back to the API again.
+    FEEDS = ('API', 'Bigpara')
+    
+    def __init__(self, db_path='gold_prices.db', bucket_seconds=60, instrument=DEFAULT_INSTRUMENT, init_db=True,
+                 tick_capacity=10000):
         self.db_path = db_path
-        self.init_database()
+        # Keep bucket_seconds stable for a given database, buckets of existing rows are not recomputed
+        self.bucket_seconds = bucket_seconds
+        self._bucket_delta = timedelta(seconds=bucket_seconds)
+        self.instrument = instrument
+        # Last saved price per (source, instrument), used to skip unchanged ticks
+        self._last_prices = {}
+        # Recent ticks kept in memory, loaded from the database on first use
+        self.tick_capacity = tick_capacity
+        self._recent_ticks = None
+        self._ticks_data_version = None
+        self._ticks_conn = None
+        # Fetch-only instances (collection workers) leave the database to the writer
+        if init_db:
+            self.init_database()
         
     def init_database(self):
         """Initialize SQLite database with gold prices table"""
@@ -29,14 +79,80 @@ class GoldPriceScraper:
                 price_per_gram REAL,
                 currency TEXT DEFAULT 'TRY',
                 source TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                instrument TEXT DEFAULT '{}',
+                time_bucket INTEGER
             )
-        ''')
+        '''.format(self.DEFAULT_INSTRUMENT))
+        
+        # Migrate databases created before the natural key existed
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(gold_prices)")]
+        if 'instrument' not in columns:
+            cursor.execute(
+                "ALTER TABLE gold_prices ADD COLUMN instrument TEXT DEFAULT '{}'".format(self.DEFAULT_INSTRUMENT)
+            )
+        if 'time_bucket' not in columns:
+            cursor.execute("ALTER TABLE gold_prices ADD COLUMN time_bucket INTEGER")
+            # One-off backfill, every later write sets time_bucket itself
+            cursor.execute('''
+                UPDATE gold_prices
+                SET time_bucket = CAST(strftime('%s', date_time) AS INTEGER) / ? * ?
+            ''', (self.bucket_seconds, self.bucket_seconds))
+        
+        # A no-op while the index exists. Duplicates are only deleted when it is
+        # missing (migration, or after the backfill importer dropped it) and rows clash.
+        try:
+            cursor.execute(CREATE_NATURAL_KEY_SQL)
+        except sqlite3.IntegrityError:
+            removed = self._delete_duplicates(cursor)
+            logger.warning(f"Removed {removed} duplicate price rows while building the natural key index")
+            cursor.execute(CREATE_NATURAL_KEY_SQL)
+        
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS {} ON gold_prices (date_time)".format(DATE_TIME_INDEX)
+        )
         
         conn.commit()
         conn.close()
         logger.info("Database initialized successfully")
     
+    def time_bucket(self, date_time):
+        """Return the epoch start of the bucket containing a naive date_time (treated as UTC, like SQLite does)"""
+        return (date_time - EPOCH) // self._bucket_delta * self.bucket_seconds
+    
+    def _delete_duplicates(self, cursor):
+        """Keep only the most recently written row for each natural key"""
+        cursor.execute('''
+            DELETE FROM gold_prices
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM gold_prices
+                GROUP BY source, instrument, time_bucket
+            )
+        ''')
+        return cursor.rowcount
+    
+    def deduplicate_prices(self, vacuum=True):
+        """Remove duplicate rows sharing source, instrument and time bucket"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            removed = self._delete_duplicates(cursor)
+            cursor.execute(CREATE_NATURAL_KEY_SQL)
+            conn.commit()
+            
+            # Reclaim the space freed by the deleted rows
+            if vacuum:
+                conn.execute("VACUUM")
+            conn.close()
+            
+            logger.info(f"Removed {removed} duplicate price rows")
+            return removed
+            
+        except Exception as e:
+            logger.error(f"Error deduplicating database: {e}")
+            return None
+    
     def scrape_gold_price_bigpara(self):
         """Scrape gold price from Bigpara (Turkish financial site)"""
         try:
@@ -170,28 +286,57 @@ class GoldPriceScraper:
             logger.error(f"Error with alternative method: {e}")
             return None
     
-    def save_price_to_db(self, price, source="API"):
-        """Save gold price to database"""
+    def fetch_price(self, source):
+        """Fetch the current price from a single named source"""
+        return getattr(self, self.SOURCES[source])()
+    
+    def save_price_to_db(self, price, source="API", date_time=None, instrument=None, currency='TRY'):
+        """Save gold price to database, updating the row already stored for the same time bucket"""
         if price is None:
             logger.warning("Cannot save None price to database")
             return False
+        
+        instrument = instrument or self.instrument
+        cache_key = (source, instrument)
+        if self._last_prices.get(cache_key) == price:
+            logger.info(f"Price {price} TRY unchanged for source: {source}, skipping write")
+            return True
+        
+        date_time = date_time or datetime.now()
+            
+        bucket = self.time_bucket(date_time)
             
         try:
-            conn = sqlite3.connect(self.db_path)
+            # Written through the tick buffer's connection so the buffer can mirror the write
+            conn = self._ticks_connection()
             cursor = conn.cursor()
             
             cursor.execute('''
-                INSERT INTO gold_prices (date_time, price_per_gram, source)
-                VALUES (?, ?, ?)
-            ''', (datetime.now(), price, source))
+                SELECT 1 FROM gold_prices
+                WHERE source = ? AND instrument = ? AND time_bucket = ?
+            ''', (source, instrument, bucket))
+            replaces_row = cursor.fetchone() is not None
             
+            cursor.execute(UPSERT_PRICE_SQL, (date_time, price, currency, source, instrument, bucket))
             conn.commit()
-            conn.close()
             
+            # An updated row would leave its old tick behind and a backdated tick would be
+            # restamped by the buffer, so reload the buffer instead of appending
+            if self._recent_ticks is not None:
+                epoch = date_time.timestamp()
+                latest = self._recent_ticks.latest()
+                if replaces_row or (latest is not None and epoch < latest[0]):
+                    self._recent_ticks = None
+                else:
+                    self._recent_ticks.append(epoch, price, source)
+            
+            self._last_prices[cache_key] = price
             logger.info(f"Price {price} TRY saved to database from source: {source}")
             return True
             
         except Exception as e:
+            if self._ticks_conn is not None:
+                self._ticks_conn.rollback()
             logger.error(f"Error saving to database: {e}")
             return False
     
@@ -200,16 +345,11 @@ class GoldPriceScraper:
         logger.info("Fetching current gold price...")
         
         # Try multiple sources
-        price = self.get_gold_price_api()
-        source = "API"
-        
-        if price is None:
-            price = self.scrape_gold_price_bigpara()
-            source = "Bigpara"
-            
-        if price is None:
-            price = self.get_alternative_gold_price()
-            source = "Alternative"
+        price = None
+        for source in self.SOURCES:
+            price = self.fetch_price(source)
+            if price is not None:
+                break
         
         if price:
             self.save_price_to_db(price, source)
@@ -219,6 +359,110 @@ class GoldPriceScraper:
             logger.error("Failed to fetch gold price from all sources")
             return None
     
+    def _ticks_connection(self):
+        """Connection used to load the tick buffer and by save_price_to_db"""
+        if self._ticks_conn is None:
+            self._ticks_conn = sqlite3.connect(self.db_path)
+        return self._ticks_conn
+    
+    @property
+    def recent_ticks(self):
+        """In-memory buffer of the most recent (epoch, price, source) ticks
+        
+        PRAGMA data_version only changes when another connection commits, so any
+        write not mirrored by save_price_to_db (sample data, other processes,
+        the backfill importer) makes the buffer reload on next use.
+        """
+        conn = self._ticks_connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        
+        if self._recent_ticks is None or data_version != self._ticks_data_version:
+            self._recent_ticks = TickRingBuffer(self.tick_capacity)
+            rows = self._query_recent_prices(limit=self.tick_capacity, conn=conn)
+            for date_time, price, source in reversed(rows):
+                self._recent_ticks.append(date_time.timestamp(), price, source)
+            self._ticks_data_version = data_version
+        return self._recent_ticks
+    
+    def _query_recent_prices(self, since=None, limit=-1, conn=None):
+        """Read (datetime, price, source) rows from the database, newest first"""
+        own_conn = conn is None
+        try:
+            if own_conn:
+                conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT date_time, price_per_gram, source
+                FROM gold_prices
+                WHERE date_time >= ?
+                ORDER BY date_time DESC
+                LIMIT ?
+            ''', (since.isoformat(' ') if since else '', limit))
+            rows = [(datetime.fromisoformat(date_time), price, source)
+                    for date_time, price, source in cursor.fetchall()]
+            if own_conn:
+                conn.close()
+            return rows
+            
+        except Exception as e:
+            logger.error(f"Error reading recent prices: {e}")
+            return []
+    
+    def get_recent_ticks(self, days=7):
+        """Get (epoch, price, source) ticks for the last days, newest first, from memory when possible"""
+        cutoff = datetime.now() - timedelta(days=days)
+        if self.recent_ticks.covers(cutoff.timestamp()):
+            return self.recent_ticks.since(cutoff.timestamp())
+        
+        # The window reaches further back than the buffer holds
+        return [(date_time.timestamp(), price, source)
+                for date_time, price, source in self._query_recent_prices(since=cutoff)]
+    
+    def _query_price_at(self, date_time):
+        """Price of the last row at or before date_time, or of the oldest row when none is that old"""
+        cursor = self._ticks_connection().cursor()
+        cursor.execute('''
+            SELECT price_per_gram FROM gold_prices
+            WHERE date_time <= ?
+            ORDER BY date_time DESC
+            LIMIT 1
+        ''', (date_time.isoformat(' '),))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("SELECT price_per_gram FROM gold_prices ORDER BY date_time LIMIT 1")
+            row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def get_price_change(self, days=7):
+        """Get (change, change_percent) of the latest price against the price days ago, or None"""
+        cutoff = datetime.now() - timedelta(days=days)
+        recent_ticks = self.recent_ticks
+        if recent_ticks.covers(cutoff.timestamp()):
+            return recent_ticks.change_since(cutoff.timestamp())
+        
+        # The price at the cutoff was already overwritten in the buffer
+        try:
+            old_price = self._query_price_at(cutoff)
+        except Exception as e:
+            logger.error(f"Error reading price from {days} days ago: {e}")
+            return None
+        
+        change = recent_ticks.latest()[1] - old_price
+        return change, (change / old_price) * 100
+    
+    def clear_database(self):
+        """Delete all stored prices and start over with an empty database"""
+        if self._ticks_conn is not None:
+            self._ticks_conn.close()
+            self._ticks_conn = None
+        self._recent_ticks = None
+        self._last_prices = {}
+        
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+        self.init_database()
+    
     def get_historical_data(self, days=365):
         """Get historical data from database"""
         try:
@@ -248,9 +492,13 @@ class GoldPriceScraper:
         import random
         base_price = 4249  # Current realistic base price around 4249 TRY per gram
         
+        # Align samples to midnight so re-runs update the same buckets instead of adding rows
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        rows = []
+        
         for i in range(days):
             # Create dates going backwards
-            date = datetime.now() - timedelta(days=i)
+            date = today - timedelta(days=i)
             
             # Simulate more realistic price variations
             # Gold prices can vary significantly over a year
@@ -258,16 +506,13 @@ class GoldPriceScraper:
             trend_factor = random.uniform(0.85, 1.15)  # Long-term trend variation
             price = round(base_price * trend_factor * (1 + daily_change), 2)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO gold_prices (date_time, price_per_gram, source)
-                VALUES (?, ?, ?)
-            ''', (date, price, "SIMULATED"))
-            
-            conn.commit()
-            conn.close()
+            rows.append((date, price, 'TRY', "SIMULATED", self.instrument, self.time_bucket(date)))
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany(UPSERT_PRICE_SQL, rows)
+        conn.commit()
+        conn.close()
         
         logger.info(f"Generated {days} days of sample data")
     
@@ -286,6 +531,18 @@ class GoldPriceScraper:
             schedule.run_pending()
             time.sleep(1)
     
+    def start_supervised_scraping(self, interval_minutes=60, num_workers=2, sources=None):
+        """Start scraping with independent feeds spread over worker processes and a single writer process"""
+        from collector import CollectionSupervisor
+        
+        supervisor = CollectionSupervisor(
+            db_path=self.db_path,
+            sources=sources,
+            num_workers=num_workers,
+            interval_minutes=interval_minutes,
+        )
+        supervisor.run()
+    
     def export_data_to_csv(self, filename="gold_prices_export.csv", days=365):
         """Export historical data to CSV"""
         df = self.get_historical_data(days)
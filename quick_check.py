@@ -19,11 +19,9 @@ def quick_price_check():
         print(f"💰 Current gold price: {price} TRY per gram")
         
         # Get recent trend if available
-        recent_data = scraper.get_historical_data(7)
-        if len(recent_data) > 1:
-            old_price = recent_data.iloc[-1]['price_per_gram']
-            change = price - old_price
-            change_percent = (change / old_price) * 100
+        price_change = scraper.get_price_change(7)
+        if price_change:
+            change, change_percent = price_change
             
             if change > 0:
                 trend = f"📈 +{change:.2f} TRY (+{change_percent:.1f}%) from last week"
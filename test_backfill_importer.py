@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Behavior checks for the historical CSV importer
+from datetime import datetime, timedelta
+import sqlite3
+
+import pytest
+
+from backfill_importer import BackfillImporter, parse_price, parse_timestamp
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('4281.99', 4281.99),
+    ('4281', 4281.0),
+    ('4,281.99', 4281.99),
+    ('4.281,99', 4281.99),
+    ('1.234.567', 1234567.0),
+    ('1,234,567.5', 1234567.5),
+    ('4281,5', 4281.5),
+    ('₺ 4.281,99', 4281.99),
+])
+def test_parse_price_separators(value, expected):
+    assert parse_price(value) == expected
+
+
+@pytest.mark.parametrize('value', ['4.281', '1,234', '1e3', '1_000', 'nan', 'inf', '0', '-5', '4,28.99'])
+def test_parse_price_rejects_ambiguous_and_invalid(value):
+    with pytest.raises(ValueError):
+        parse_price(value)
+
+
+def test_parse_timestamp_formats():
+    assert parse_timestamp('2025-06-01 15:47:57.595225') == (
+        datetime(2025, 6, 1, 15, 47, 57, 595225), '2025-06-01 15:47:57.595225')
+    assert parse_timestamp('01.06.2025 10:30')[0] == datetime(2025, 6, 1, 10, 30)
+    assert parse_timestamp('1700000000')[0] == datetime.fromtimestamp(1700000000)
+
+
+@pytest.mark.parametrize('value', [
+    '2024',                 # bare year read as epoch seconds
+    '45292',                # spreadsheet serial date read as epoch seconds
+    '2099-01-01 00:00:00',  # far future
+    '1999-12-31 23:59:59',
+    'yesterday',
+])
+def test_parse_timestamp_rejects_out_of_range(value):
+    with pytest.raises(ValueError):
+        parse_timestamp(value)
+
+
+def test_parse_timestamp_allows_one_day_ahead():
+    tomorrow = (datetime.now() + timedelta(hours=12)).strftime('%Y-%m-%d %H:%M:%S')
+    assert parse_timestamp(tomorrow)[1] == tomorrow
+    with pytest.raises(ValueError):
+        parse_timestamp((datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def write_csv(path, count):
+    """CSV with one price per hour, all in distinct time buckets"""
+    start = datetime(2024, 1, 1)
+    lines = ['date_time,price,currency']
+    for i in range(count):
+        lines.append(f"{(start + timedelta(hours=i)).isoformat(' ')},{4000 + i}.5,TRY")
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def test_interrupted_import_resumes_without_duplicates(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'prices.db')
+    csv_path = tmp_path / 'history.csv'
+    write_csv(csv_path, 10)
+
+    # Fail on the third chunk, after the first transaction (4 rows) was committed
+    calls = []
+    normalize_rows = BackfillImporter._normalize_rows
+
+    def failing_normalize_rows(self, rows, indexes, stats):
+        calls.append(len(rows))
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+        return normalize_rows(self, rows, indexes, stats)
+
+    monkeypatch.setattr(BackfillImporter, '_normalize_rows', failing_normalize_rows)
+    with pytest.raises(RuntimeError):
+        BackfillImporter(db_path, chunk_size=2, transaction_rows=4).import_file(str(csv_path))
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM gold_prices").fetchone()[0] == 4
+    assert conn.execute("SELECT rows_done, completed FROM import_progress").fetchone() == (4, 0)
+    conn.close()
+
+    monkeypatch.setattr(BackfillImporter, '_normalize_rows', normalize_rows)
+    assert BackfillImporter(db_path, chunk_size=2, transaction_rows=4).import_file(str(csv_path)) == 10
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM gold_prices").fetchone()[0] == 10
+    assert conn.execute(
+        "SELECT COUNT(DISTINCT date_time) FROM gold_prices").fetchone()[0] == 10
+    assert conn.execute("SELECT completed FROM import_progress").fetchone()[0] == 1
+    conn.close()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+# Behavior checks for the recent price reads of GoldPriceScraper
+from datetime import datetime, timedelta
+
+from price_scraper import GoldPriceScraper
+
+
+def daily_prices(tmp_path, capacity, days=10):
+    """Scraper with one price per day, from 100 + 10 * days (oldest) down to 100 (today)"""
+    scraper = GoldPriceScraper(db_path=str(tmp_path / 'prices.db'), tick_capacity=capacity)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for days_ago in range(days, -1, -1):
+        scraper.save_price_to_db(100.0 + 10 * days_ago, 'API', date_time=today - timedelta(days=days_ago))
+    return scraper
+
+
+def test_price_change_within_buffer(tmp_path):
+    scraper = daily_prices(tmp_path, capacity=100)
+
+    change, change_percent = scraper.get_price_change(7)
+    assert change == -70.0
+    assert round(change_percent, 6) == round(-70.0 / 170.0 * 100, 6)
+
+
+def test_price_change_older_than_buffer_reads_database(tmp_path):
+    # The buffer only holds the last 5 days, the price 7 days ago comes from the database
+    scraper = daily_prices(tmp_path, capacity=5)
+    assert not scraper.recent_ticks.covers((datetime.now() - timedelta(days=7)).timestamp())
+
+    change, _ = scraper.get_price_change(7)
+    assert change == -70.0
+
+
+def test_backdated_save_is_not_restamped(tmp_path):
+    scraper = daily_prices(tmp_path, capacity=100, days=2)
+    scraper.save_price_to_db(50.0, 'API', date_time=datetime.now() - timedelta(days=20))
+
+    latest_epoch, latest_price, _ = scraper.recent_ticks.latest()
+    assert latest_price == 100.0
+    assert scraper.recent_ticks.oldest()[1] == 50.0
+    assert len(scraper.recent_ticks) == 4
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Behavior checks for the in-memory tick ring buffer
+from tick_buffer import TickRingBuffer
+
+
+def filled_buffer(capacity, count):
+    """Buffer with ticks at epochs 0, 10, 20, ... and prices 100, 101, 102, ..."""
+    buffer = TickRingBuffer(capacity)
+    for i in range(count):
+        buffer.append(i * 10.0, 100.0 + i, 'API' if i % 2 else 'SIMULATED')
+    return buffer
+
+
+def test_wraparound_keeps_newest_ticks_in_order():
+    buffer = filled_buffer(capacity=4, count=7)
+
+    assert len(buffer) == 4
+    assert buffer.oldest() == (30.0, 103.0, 'API')
+    assert buffer.latest() == (60.0, 106.0, 'SIMULATED')
+    assert [tick[0] for tick in buffer.since(0)] == [60.0, 50.0, 40.0, 30.0]
+
+
+def test_since_and_covers_at_the_boundary():
+    buffer = filled_buffer(capacity=4, count=7)
+
+    # Exactly at the oldest held tick: included and still covered
+    assert [tick[0] for tick in buffer.since(30.0)] == [60.0, 50.0, 40.0, 30.0]
+    assert buffer.covers(30.0)
+    # Just before it the overwritten tick at 20 would be needed
+    assert not buffer.covers(29.9)
+    assert [tick[0] for tick in buffer.since(30.1)] == [60.0, 50.0, 40.0]
+    assert buffer.since(60.1) == []
+
+
+def test_covers_everything_until_full():
+    buffer = filled_buffer(capacity=4, count=3)
+    assert buffer.covers(-1000.0)
+
+
+def test_price_at_uses_last_tick_at_or_before():
+    buffer = filled_buffer(capacity=4, count=7)
+
+    assert buffer.price_at(40.0) == 104.0
+    assert buffer.price_at(45.0) == 104.0
+    assert buffer.price_at(29.0) is None
+
+
+def test_change_since_needs_two_ticks():
+    buffer = TickRingBuffer(4)
+    assert buffer.change_since(0) is None
+
+    buffer.append(10.0, 100.0, 'API')
+    assert buffer.change_since(0) is None
+
+    buffer.append(20.0, 110.0, 'API')
+    change, change_percent = buffer.change_since(10.0)
+    assert change == 10.0
+    assert round(change_percent, 6) == 10.0
+    # Reference at the newest tick leaves nothing to compare
+    assert buffer.change_since(20.0) is None
+
+
+def test_change_since_falls_back_to_oldest_tick():
+    buffer = filled_buffer(capacity=4, count=7)
+    change, _ = buffer.change_since(0.0)
+    assert change == 106.0 - 103.0
+
+
+def test_out_of_order_tick_is_clamped():
+    buffer = filled_buffer(capacity=4, count=3)
+    buffer.append(5.0, 99.0, 'Bigpara')
+
+    assert buffer.latest() == (20.0, 99.0, 'Bigpara')
+    assert [tick[0] for tick in buffer.since(0)] == [20.0, 20.0, 10.0, 0.0]
@@ -0,0 +1,119 @@
+"""
+Compact In-Memory Tick Buffer
+=============================
+
+Fixed-capacity ring buffer holding the most recent (epoch, price, source)
+ticks in flat arrays, about 18 bytes per tick. Ticks are kept in time order
+so window queries use binary search instead of scanning.
+"""
+
+from array import array
+
+
+class TickRingBuffer:
+    """Ring buffer of recent price ticks, the oldest tick is overwritten when full"""
+
+    __slots__ = ('capacity', '_epochs', '_prices', '_source_ids', '_source_index',
+                 '_source_names', '_start', '_size')
+
+    def __init__(self, capacity=10000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._epochs = array('d', [0.0]) * capacity
+        self._prices = array('d', [0.0]) * capacity
+        self._source_ids = array('H', [0]) * capacity
+        # Sources are stored as small integer ids
+        self._source_index = {}
+        self._source_names = []
+        # Physical position of the oldest tick and number of ticks held
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _position(self, i):
+        """Physical array position of the i-th oldest tick"""
+        return (self._start + i) % self.capacity
+
+    def _tick(self, i):
+        pos = self._position(i)
+        return self._epochs[pos], self._prices[pos], self._source_names[self._source_ids[pos]]
+
+    def _source_id(self, source):
+        source_id = self._source_index.get(source)
+        if source_id is None:
+            source_id = len(self._source_names)
+            self._source_index[source] = source_id
+            self._source_names.append(source)
+        return source_id
+
+    def append(self, epoch, price, source):
+        """Add a tick. Ticks older than the newest one are stored at its timestamp to keep the order."""
+        if self._size:
+            epoch = max(epoch, self._epochs[self._position(self._size - 1)])
+
+        if self._size < self.capacity:
+            pos = self._position(self._size)
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._epochs[pos] = epoch
+        self._prices[pos] = price
+        self._source_ids[pos] = self._source_id(source)
+
+    def latest(self):
+        """Return the newest (epoch, price, source) tick, or None when empty"""
+        return self._tick(self._size - 1) if self._size else None
+
+    def oldest(self):
+        """Return the oldest (epoch, price, source) tick, or None when empty"""
+        return self._tick(0) if self._size else None
+
+    def _bisect(self, epoch, after=False):
+        """Index of the first tick at or after epoch (strictly after when after=True)"""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_epoch = self._epochs[self._position(mid)]
+            if mid_epoch < epoch or (after and mid_epoch == epoch):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def covers(self, epoch):
+        """Whether every tick since epoch is still held (nothing was overwritten)"""
+        if self._size < self.capacity:
+            return True
+        return self._epochs[self._start] <= epoch
+
+    def since(self, epoch):
+        """Return ticks at or after epoch, newest first"""
+        first = self._bisect(epoch)
+        return [self._tick(i) for i in range(self._size - 1, first - 1, -1)]
+
+    def price_at(self, epoch):
+        """Return the price of the last tick at or before epoch, or None"""
+        i = self._bisect(epoch, after=True) - 1
+        return self._prices[self._position(i)] if i >= 0 else None
+
+    def change_since(self, epoch):
+        """Return (change, change_percent) of the latest price against the price at epoch
+
+        When no tick is that old the oldest held tick is used instead. Returns
+        None when there are fewer than two ticks to compare.
+        """
+        if self._size < 2:
+            return None
+
+        reference = max(self._bisect(epoch, after=True) - 1, 0)
+        if reference == self._size - 1:
+            return None
+
+        old_price = self._prices[self._position(reference)]
+        change = self._prices[self._position(self._size - 1)] - old_price
+        return change, (change / old_price) * 100